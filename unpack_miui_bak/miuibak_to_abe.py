@@ -2,6 +2,7 @@
 
 import sys
 import os
+import shutil
 
 if len(sys.argv) != 2:
     print("usage %s miui_backup_file" % sys.argv[0])
@@ -14,9 +15,8 @@ if pos == -1:
     print("signature not found")
     sys.exit(2)
 f.seek(pos)
-s = f.read()
 ff = open('tmp.ab', 'wb')
-ff.write(s)
+shutil.copyfileobj(f, ff)
 ff.close()
 f.close()
 print("done convert miui_backup_file to abe format")
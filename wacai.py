@@ -5,15 +5,13 @@ Created on Fri Mar  8 19:32:52 2019
 @author: jasonjsyuan
 """
 
-import xlwt
 import pandas as pd
 import sqlite3
 from datetime import datetime
 import sys
 
 
-def parse_account(account_uuid, accounts):
-    account = accounts[account_uuid]
+def parse_account(account):
     pos = account.find('-')
     fee_type = '人民币'
     if pos != -1:
@@ -22,42 +20,45 @@ def parse_account(account_uuid, accounts):
     return account, fee_type
 
 
+def format_money(money):
+    if isinstance(money, (str, bytes)):
+        raise ValueError('invalid money: %r' % money)
+    return '%.2f' % money
+
+
 if len(sys.argv) != 2:
     print("Usage: %s wacai.so" % sys.argv[0])
     sys.exit(1)
 
 conn = sqlite3.connect(sys.argv[1])
 
-df = pd.read_sql_query('select uuid,name from TBL_ACCOUNTINFO', conn)
-accounts = {}
-for _, row in df.iterrows():
-    accounts[row['uuid']] = row['name']
-
-df = pd.read_sql_query('select uuid,name from TBL_OUTGOCATEGORYINFO', conn)
-outgomaintype = {}
-for _, row in df.iterrows():
-    outgomaintype[row['uuid']] = row['name']
+df = pd.read_sql_query(
+    'select uuid,name from TBL_ACCOUNTINFO where name is not null', conn)
+accounts = dict(zip(df['uuid'], df['name'].map(parse_account)))
 
 df = pd.read_sql_query(
     'select uuid,name,parentUuid from TBL_OUTGOCATEGORYINFO', conn)
-outgosubtype = {}
-outgosubtomain = {}
-for _, row in df.iterrows():
-    outgosubtype[row['uuid']] = row['name']
-    outgosubtomain[row['uuid']] = row['parentUuid']
+outgotype = dict(zip(df['uuid'], df['name']))
+# 支出小类 -> (支出大类, 支出小类)
+outgocategory = {}
+for uuid, name, parent in zip(df['uuid'], df['name'], df['parentUuid']):
+    if parent in outgotype:
+        outgocategory[uuid] = (outgotype[parent], name)
 
 df = pd.read_sql_query('select uuid,name from TBL_INCOMEMAINTYPEINFO', conn)
-incomemaintype = {}
-for _, row in df.iterrows():
-    incomemaintype[row['uuid']] = row['name']
+incomemaintype = dict(zip(df['uuid'], df['name']))
 
 df = pd.read_sql_query('select uuid,name from TBL_BOOK', conn)
-books = {}
-for _, row in df.iterrows():
-    books[row['uuid']] = row['name']
+books = dict(zip(df['uuid'], df['name']))
 
 df = pd.read_sql_query(
-    'select * from TBL_TRADEINFO where date>0 order by date', conn)
+    'select bookUuid,accountUuid,accountUuid2,typeUuid,tradetype,money,money2,'
+    'comment,date from TBL_TRADEINFO where date>0 and ifnull(isdelete,0)<>1 '
+    'order by date', conn)
+# 金额以分为单位存储，无法解析的金额保留原值，由format_money报错
+for col in ('money', 'money2'):
+    money = pd.to_numeric(df[col], errors='coerce') / 100
+    df[col] = money.where(money.notna() | df[col].isna(), df[col])
 
 # 支出
 dd_outgo = []
@@ -70,68 +71,49 @@ dd_borrow = []
 # 收款还款
 dd_refund = []
 
-for _, row in df.iterrows():
+for row in df.itertuples(index=False):
     try:
-        if row['isdelete'] == 1:
-            continue
-
-        book = books[row['bookUuid']]
-        account, fee_type = parse_account(row['accountUuid'], accounts)
-        dd = datetime.fromtimestamp(row['date']).strftime('%Y-%m-%d %H:%M:%S')
-        # print(book,account)
+        book = books[row.bookUuid]
+        account, fee_type = accounts[row.accountUuid]
+        dd = datetime.fromtimestamp(row.date).strftime('%Y-%m-%d %H:%M:%S')
 
-        tradetype = row['tradetype']
+        tradetype = row.tradetype
         if tradetype == 1:
             # outcome
-            maintyp = outgomaintype[outgosubtomain[row['typeUuid']]]
-            subtyp = outgosubtype[row['typeUuid']]
+            maintyp, subtyp = outgocategory[row.typeUuid]
             dd_outgo.append((maintyp, subtyp, account, fee_type, '日常', '',
-                             '非报销', dd, '%.2f' % (float(row['money'])/100),
-                             '', row['comment'] or '', book))
+                             '非报销', dd, format_money(row.money),
+                             '', row.comment or '', book))
         elif tradetype == 2:
             # income
-            typ = incomemaintype[row['typeUuid']]
+            typ = incomemaintype[row.typeUuid]
             dd_income.append((typ, account, fee_type, '日常', '',
-                              dd, '%.2f' % (float(row['money'])/100),
-                              '', row['comment'] or '', book))
+                              dd, format_money(row.money),
+                              '', row.comment or '', book))
         elif tradetype == 3:
             # transfer
-            account2, fee_type2 = parse_account(row['accountUuid2'], accounts)
-            dd_transfer.append((account, fee_type, '%.2f' % (float(row['money'])/100),
-                                account2, fee_type2, '%.2f' % (float(row['money2'])/100), dd, row['comment'] or '', book))
+            account2, fee_type2 = accounts[row.accountUuid2]
+            dd_transfer.append((account, fee_type, format_money(row.money),
+                                account2, fee_type2, format_money(row.money2),
+                                dd, row.comment or '', book))
         elif tradetype == 4:
-            # borrow
-            if row['typeUuid'] == '0':
-                # borrow in
-                account2, fee_type2 = parse_account(
-                    row['accountUuid2'], accounts)
-                dd_borrow.append(('借入', dd, account2, account, '%.2f' % (
-                    float(row['money'])/100), row['comment'] or '', book))
-            else:
-                # borrow out
-                account2, fee_type2 = parse_account(
-                    row['accountUuid2'], accounts)
-                dd_borrow.append(('借出', dd, account2, account, '%.2f' % (
-                    float(row['money'])/100), row['comment'] or '', book))
+            # borrow in / borrow out
+            kind = '借入' if row.typeUuid == '0' else '借出'
+            account2, fee_type2 = accounts[row.accountUuid2]
+            dd_borrow.append((kind, dd, account2, account,
+                              format_money(row.money),
+                              row.comment or '', book))
         elif tradetype == 5:
-            # refund
-            if row['typeUuid'] == '0':
-                # refund in
-                account2, fee_type2 = parse_account(
-                    row['accountUuid2'], accounts)
-                dd_refund.append(('收款', dd, account2, account, '%.2f' % (
-                    float(row['money'])/100), '%.2f' % (
-                    float(row['money2'])/100), row['comment'] or '', book))
-            else:
-                # refund out
-                account2, fee_type2 = parse_account(
-                    row['accountUuid2'], accounts)
-                dd_refund.append(('还款', dd, account2, account, '%.2f' % (
-                    float(row['money'])/100), '%.2f' % (
-                    float(row['money2'])/100), row['comment'] or '', book))
+            # refund in / refund out
+            kind = '收款' if row.typeUuid == '0' else '还款'
+            account2, fee_type2 = accounts[row.accountUuid2]
+            dd_refund.append((kind, dd, account2, account,
+                              format_money(row.money),
+                              format_money(row.money2),
+                              row.comment or '', book))
         else:
             print(row)
-            typ = incomemaintype[row['typeUuid']]
+            typ = incomemaintype[row.typeUuid]
             print(typ)
     except Exception as e:
         print('exception', e)
@@ -157,5 +139,3 @@ df_transfer.to_excel(writer, sheet_name='转账', index=False)
 df_borrow.to_excel(writer, sheet_name='借入借出', index=False)
 df_refund.to_excel(writer, sheet_name='收款还款', index=False)
 writer.close()
-
-print(accounts)